@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Compare the speed and size of all archive formats on a directory.
+
+Usage: benchmark_formats.py DIRECTORY [REPEAT]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from releaseman import file_archiver
+
+
+CASES = [
+    ("zip", None),
+    ("tar", None),
+    ("tar.gz", None),
+    ("tar.bz2", None),
+    ("tar.xz", None),
+    ("tar.zst", {"level": 3, "threads": 0}),
+    ("tar.zst", {"level": 3, "threads": -1}),
+    ("tar.zst", {"level": 19, "threads": -1}),
+    ("tar.zst", {"level": 19, "threads": -1, "long_distance_matching": True}),
+]
+
+
+def benchmark(directory: Path, repeat: int = 3) -> list[tuple[str, float, int]]:
+    results = []
+    files = [{"source": str(directory.resolve()), "destination": directory.resolve().name}]
+    for output_format, zstd_options in CASES:
+        label = output_format
+        if zstd_options:
+            label += " (" + ", ".join(f"{key}={value}" for key, value in zstd_options.items()) + ")"
+        durations = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as out_dir:
+                start = time.perf_counter()
+                archive = file_archiver.make(
+                    root_path=directory.parent,
+                    files=files,
+                    out_dir=Path(out_dir),
+                    name="benchmark",
+                    output_format=output_format,
+                    zstd_options=zstd_options,
+                )
+                durations.append(time.perf_counter() - start)
+                size = archive.path.stat().st_size
+        results.append((label, min(durations), size))
+    return results
+
+
+def report(results: list[tuple[str, float, int]]) -> str:
+    uncompressed_size = next(size for label, _, size in results if label == "tar")
+    width = max(len(label) for label, _, _ in results)
+    lines = [f"{'Format':<{width}}  {'Time (s)':>9}  {'Size (bytes)':>14}  {'Ratio':>6}"]
+    for label, duration, size in results:
+        lines.append(f"{label:<{width}}  {duration:>9.3f}  {size:>14,}  {size / uncompressed_size:>6.1%}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print(f"Usage: {sys.argv[0]} DIRECTORY [REPEAT]")
+        sys.exit(1)
+    print(report(benchmark(Path(sys.argv[1]), *(int(arg) for arg in sys.argv[2:]))))
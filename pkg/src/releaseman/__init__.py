@@ -1,4 +1,9 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from pathlib import Path
+import threading
 
 from rich.text import Text
 import actionman as _actionman
@@ -11,17 +16,21 @@ from releaseman.zenodo import ZenodoRelease
 from releaseman.dstruct import Token
 from releaseman.exception import ReleaseManException
 from releaseman.report import Reporter, make_sphinx_target_config
+from releaseman.transport import Transport
 from releaseman import data
 
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
 
-def run():
+def run(transport: Transport | None = None):
 
-    def run_manager(manager: GitHubRelease | ZenodoRelease):
+    def run_manager(manager: GitHubRelease | ZenodoRelease, step: Callable[[], Any] | None = None):
         try:
-            manager.run()
+            (step or manager.run)()
         except ReleaseManException:
             _logger.section_end(target_level=current_log_section_level)
-            _finalize(github_context=github_context, reporter=reporter)
+            _finalize(github_context=github_context, reporter=reporter, transport=transport)
             return False
         except Exception as e:
             traceback = _logger.traceback()
@@ -39,7 +48,7 @@ def run():
                 ),
             )
             _logger.section_end(target_level=current_log_section_level)
-            _finalize(github_context=github_context, reporter=reporter)
+            _finalize(github_context=github_context, reporter=reporter, transport=transport)
             _logger.critical(
                 f"Unexpected Error: {error_name}",
                 traceback,
@@ -67,42 +76,82 @@ def run():
                 raise ValueError(f"{name} token not provided while config is provided.")
             data.validate_schema(config, validation_name)
             inputs[env_var_segment.lower()] = {"token": token, "config": config}
-
-    current_log_section_level = _logger.current_section_level
-
-    for release_type in ("zenodo_sandbox", "zenodo"):
-        if release_type in inputs:
-            _logger.section(release_type.replace("_", " ").title())
-            release_manager = ZenodoRelease(
+    owns_transport = transport is None
+    if owns_transport:
+        http_config = _actionman.env_var.read(name="RD_RELEASEMAN__HTTP_CONFIG", typ=dict) or {}
+        data.validate_schema(http_config, "http")
+        transport = Transport(**http_config)
+    # All API requests of all managers share the same connection pool.
+    transport.install()
+    try:
+        current_log_section_level = _logger.current_section_level
+
+        managers = {}
+        for release_type in ("zenodo_sandbox", "zenodo"):
+            if release_type in inputs:
+                managers[release_type] = ZenodoRelease(
+                    root_path=root_path,
+                    output_path=output_path,
+                    sandbox=release_type == "zenodo_sandbox",
+                    reporter=reporter,
+                    run_id=github_context.run_id,
+                    **inputs[release_type]
+                )
+        if "github" in inputs:
+            managers["github"] = GitHubRelease(
                 root_path=root_path,
                 output_path=output_path,
-                sandbox=release_type == "zenodo_sandbox",
                 reporter=reporter,
-                **inputs[release_type]
+                context=github_context,
+                **inputs["github"]
             )
+        # All assets start building right away, while the read-only API checks of all managers
+        # (token validation, deposition retrieval, etc.) run concurrently.
+        # Nothing is changed remotely until all builds and checks have succeeded,
+        # and the first failure stops all remaining builds.
+        build_executor = ThreadPoolExecutor(thread_name_prefix="releaseman-build")
+        preflight_executor = ThreadPoolExecutor(thread_name_prefix="releaseman-preflight")
+        cancel_builds = threading.Event()
+        try:
+            _logger.section("Pre-flight")
+            owners = {}
+            for release_manager in managers.values():
+                for build in release_manager.build_assets(build_executor, cancel=cancel_builds):
+                    owners[build] = release_manager
+            for release_manager in managers.values():
+                owners[preflight_executor.submit(release_manager.prepare)] = release_manager
+            done, _ = wait(owners, return_when=FIRST_EXCEPTION)
+            failed = next((future for future in done if future.exception()), None)
+            if failed:
+                cancel_builds.set()
+                run_manager(owners[failed], failed.result)
+                return
+            _logger.section_end()
+        finally:
+            cancel_builds.set()
+            build_executor.shutdown(wait=False, cancel_futures=True)
+            preflight_executor.shutdown(wait=False, cancel_futures=True)
+        for release_type, release_manager in managers.items():
+            _logger.section("GitHub Release" if release_type == "github" else release_type.replace("_", " ").title())
             success = run_manager(release_manager)
             if not success:
                 return
             _logger.section_end()
-    if "github" in inputs:
-        _logger.section("GitHub Release")
-        release_manager = GitHubRelease(
-            root_path=root_path,
-            output_path=output_path,
-            reporter=reporter,
-            context=github_context,
-            **inputs["github"]
-        )
-        success = run_manager(release_manager)
-        if not success:
-            return
-        _logger.section_end()
-    _finalize(github_context=github_context, reporter=reporter)
+        _finalize(github_context=github_context, reporter=reporter, transport=transport)
+    finally:
+        transport.uninstall()
+        if owns_transport:
+            transport.close()
     return
 
 
 @_logger.sectioner("Output Generation")
-def _finalize(github_context: _github_contexts.GitHubContext, reporter: Reporter):
+def _finalize(github_context: _github_contexts.GitHubContext, reporter: Reporter, transport: Transport):
+    for host, host_metrics in transport.metrics.items():
+        _logger.info(
+            f"HTTP Connections: {host}",
+            str(host_metrics),
+        )
     # output = output_writer.generate(failed=reporter.failed)
     # _write_step_outputs(output)
 
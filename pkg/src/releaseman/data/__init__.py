@@ -14,7 +14,7 @@ _registry = jsonschemata.registry.make(dynamic=False, crawl=True)
 _schema_dir_path = pkgdata.get_package_path_from_caller(top_level=False) / "schema"
 
 
-def validate_schema(data: dict, name: Literal["github", "zenodo"]):
+def validate_schema(data: dict, name: Literal["github", "zenodo", "http"]):
     schema = pyserials.read.yaml_from_file(_schema_dir_path / f"{name}-config.yaml")
     jsonschemata.edit.required_last(schema)
     pyserials.validate.jsonschema(
@@ -1,4 +1,7 @@
+from __future__ import annotations
+
 from typing import NamedTuple
+from pathlib import Path
 
 
 class Token:
@@ -29,3 +32,19 @@ class Token:
 class _TitledEmoji(NamedTuple):
     title: str
     emoji: str
+
+
+class Archive(NamedTuple):
+    """An asset file created by `releaseman.file_archiver.make`.
+
+    If the file was split (see `releaseman.file_archiver.split`),
+    `parts` contains the part files followed by the reassembly manifest,
+    and the file at `path` no longer exists.
+    If an index was requested, `index` is the index file (see `releaseman.file_archiver.make`).
+    """
+    path: Path
+    mime_type: str
+    checksums: dict[str, str]
+    deduplicated_size: int = 0
+    parts: tuple[Archive, ...] = ()
+    index: Archive | None = None
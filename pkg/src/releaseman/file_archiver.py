@@ -1,18 +1,32 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
+import contextlib
+import functools
+import hashlib
+import io
+import json
+import os
 import re
 import shutil
 import tempfile
-import zipfile
 import tarfile
+import threading
+import zipfile
 import gzip
 import bz2
 import lzma
+import zlib
+from concurrent.futures import CancelledError
 from pathlib import Path
 
+import zstandard
+
+from releaseman import git_source, zip_writer
+from releaseman.dstruct import Archive
+
 if TYPE_CHECKING:
-    from typing import Literal
+    from typing import IO, Any, Callable, Literal
 
 
 MIME_TYPE = {
@@ -20,12 +34,33 @@ MIME_TYPE = {
     'gz': "application/gzip",
     'bz2': "application/x-bzip2",
     'xz': "application/x-xz",
+    'zst': "application/zstd",
     "zip": "application/zip",
 }
 COMPRESSION_MODULE = {
     'gz': gzip,
     'bz2': bz2,
     'xz': lzma,
+    'zst': zstandard,
+}
+TAR_FORMATS = ("tar", "tar.gz", "tar.bz2", "tar.xz", "tar.zst")
+CHECKSUM_ALGORITHMS = ("sha256", "md5")
+_CACHE_INFO_FILENAME = "archive.json"
+_CHUNK_SIZE = 1024 * 1024
+_CHECKPOINT_INTERVAL = 4 * 1024 * 1024
+_FRAME_COMPRESSOR = {
+    'gz': lambda: zlib.compressobj(9, zlib.DEFLATED, zlib.MAX_WBITS | 16),
+    'bz2': lambda: bz2.BZ2Compressor(9),
+    'xz': lambda: lzma.LZMACompressor(format=lzma.FORMAT_XZ),
+}
+# Largest window that decoders accept without an explicit memory limit (i.e., `zstd --long`).
+_ZSTD_LONG_WINDOW_LOG = 27
+_TAR_MEMBER_TYPE = {
+    tarfile.REGTYPE: "file",
+    tarfile.AREGTYPE: "file",
+    tarfile.DIRTYPE: "directory",
+    tarfile.SYMTYPE: "symlink",
+    tarfile.LNKTYPE: "hardlink",
 }
 
 
@@ -34,8 +69,201 @@ def make(
     files: list[dict],
     out_dir: Path,
     name: str | None = None,
-    output_format: Literal["zip", "tar", "tar.gz", "tar.bz2", "tar.xz", "gz", "bz2", "xz"] | None = None,
-) -> tuple[Path, str]:
+    output_format: Literal[
+        "zip", "tar", "tar.gz", "tar.bz2", "tar.xz", "tar.zst", "gz", "bz2", "xz", "zst"
+    ] | None = None,
+    cache_dir: Path | None = None,
+    deduplicate: bool = False,
+    split_size: int | None = None,
+    index: bool = False,
+    zstd_options: dict | None = None,
+    cancel: threading.Event | None = None,
+    filename: str | None = None,
+) -> Archive:
+    """Create an asset file from the given files.
+
+    The checksums of the output file are computed
+    while it is being written, so the file is never read back.
+
+    Files with a `ref` are read from the object database of the git repository at `root_path`
+    instead of the working tree. In that case, member order, timestamps and ownership
+    in the archive are normalized, so that the output is reproducible.
+    If all files are read from git and `cache_dir` is given,
+    the output is cached under a key derived from the IDs of the source tree objects.
+
+    With `deduplicate`, files with identical content in tar archives are only stored once;
+    repeated copies are added as hardlinks to the first one.
+    Other formats raise a `ValueError`, since they have no equivalent of hardlinks.
+
+    With `split_size`, an output file larger than the given number of bytes
+    is split into parts (see `split`).
+    This cannot be combined with `index`, since the member offsets in the index
+    refer to the complete file.
+
+    With `index`, a JSON index of the archive members is written alongside zip and tar archives
+    (other formats raise a `ValueError`), allowing clients to fetch single members with HTTP range requests.
+    It lists the name, offsets, sizes and SHA-256 digest of each member.
+    Compressed tar archives are then written as a sequence of independently compressed frames
+    (which is still a valid gzip/bzip2/xz/zstd file), and the index lists the start of each frame
+    (i.e., checkpoint) in both the compressed and uncompressed streams,
+    so that decompression can start at the frame containing the member.
+
+    `zstd_options` are keyword arguments for `zstd_compressor`,
+    used with the `tar.zst` and `zst` formats.
+
+    When `cancel` is set while the output file is being written,
+    the build stops with a `concurrent.futures.CancelledError`.
+
+    `filename` is the name under which the output file is published (e.g., the name of the release asset),
+    if different from the name of the output file.
+    It is recorded in the index and the reassembly manifest, and names the index and part files,
+    so that they refer to the published file.
+    """
+    if deduplicate and output_format not in TAR_FORMATS:
+        raise ValueError(f"Deduplication is only supported for tar formats, got format {output_format!r}.")
+    if index and output_format not in ("zip", *TAR_FORMATS):
+        raise ValueError(f"An index can only be created for zip and tar formats, got format {output_format!r}.")
+    if index and split_size:
+        raise ValueError("An index cannot be created for an asset that is split into parts.")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    commits = {
+        idx: git_source.resolve(root_path, file_data["ref"])
+        for idx, file_data in enumerate(files) if file_data.get("ref")
+    }
+    cache_path = None
+    if cache_dir and commits and len(commits) == len(files):
+        cache_key = _cache_key(
+            root_path,
+            files,
+            commits,
+            options={
+                "name": name,
+                "format": output_format,
+                "deduplicate": deduplicate,
+                "index": index,
+                "zstd": zstd_options,
+                "filename": filename,
+            },
+        )
+        cache_path = cache_dir / cache_key
+    archive = _load_from_cache(cache_path, out_dir) if cache_path else None
+    if not archive:
+        archive = _build(
+            root_path=root_path,
+            files=files,
+            commits=commits,
+            out_dir=out_dir,
+            name=name,
+            output_format=output_format,
+            deduplicate=deduplicate,
+            index=index,
+            zstd_options=zstd_options,
+            cancel=cancel,
+            filename=filename,
+        )
+        if cache_path:
+            _save_to_cache(cache_path, archive)
+    if split_size and archive.path.stat().st_size > split_size:
+        archive = split(archive, split_size, filename=filename)
+    return archive
+
+
+def split(archive: Archive, part_size: int, filename: str | None = None) -> Archive:
+    """Split an asset file into fixed-size parts.
+
+    The parts are named `<filename>.001`, `<filename>.002`, etc.,
+    and can be reassembled by concatenation, e.g., `cat <filename>.[0-9]* > <filename>`.
+    A reassembly manifest `<filename>.parts.json` is written alongside,
+    listing the original file's size and checksums, and the size and checksums of each part.
+    The original file is removed.
+    `filename` defaults to the name of the asset file.
+
+    Returns
+    -------
+    The input archive, with `parts` set to the part files followed by the manifest.
+    """
+    filename = filename or archive.path.name
+    size = archive.path.stat().st_size
+    num_parts = -(-size // part_size)
+    num_digits = max(3, len(str(num_parts)))
+    parts = []
+    with open(archive.path, 'rb') as f_in:
+        for part_number in range(1, num_parts + 1):
+            part_path = archive.path.with_name(f"{filename}.{part_number:0{num_digits}}")
+            with _HashingWriter(part_path) as f_out:
+                remaining = part_size
+                while remaining:
+                    chunk = f_in.read(min(remaining, _CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    f_out.write(chunk)
+                    remaining -= len(chunk)
+            parts.append(Archive(part_path, "application/octet-stream", f_out.checksums))
+    manifest = {
+        "filename": filename,
+        "mime_type": archive.mime_type,
+        "size": size,
+        "checksums": archive.checksums,
+        "parts": [
+            {"filename": part.path.name, "size": part.path.stat().st_size, "checksums": part.checksums}
+            for part in parts
+        ],
+    }
+    manifest_path = archive.path.with_name(f"{filename}.parts.json")
+    with _HashingWriter(manifest_path) as f_out:
+        f_out.write(json.dumps(manifest, indent=2).encode())
+    parts.append(Archive(manifest_path, "application/json", f_out.checksums))
+    archive.path.unlink()
+    return archive._replace(parts=tuple(parts))
+
+
+def write_checksum_manifest(
+    checksums: dict[str, dict[str, str]],
+    out_dir: Path,
+    name: str | None = None,
+    algorithm: Literal["sha256", "md5"] = "sha256",
+) -> Archive:
+    """Write a checksum manifest (e.g., `SHA256SUMS`) for the given assets.
+
+    Parameters
+    ----------
+    checksums
+        Mapping of asset names to their checksums, as returned by `make`.
+    out_dir
+        Directory to write the manifest file to.
+    name
+        Filename of the manifest. Defaults to `<ALGORITHM>SUMS`.
+    algorithm
+        Checksum algorithm to use.
+
+    The output follows the format of the GNU coreutils `sha256sum`/`md5sum` tools,
+    so it can be verified with e.g. `sha256sum --check SHA256SUMS`.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / (name or f"{algorithm.upper()}SUMS")
+    lines = [f"{asset_checksums[algorithm]}  {asset_name}\n" for asset_name, asset_checksums in checksums.items()]
+    content = "".join(lines).encode()
+    manifest_path.write_bytes(content)
+    return Archive(
+        path=manifest_path,
+        mime_type="text/plain",
+        checksums={alg: hashlib.new(alg, content).hexdigest() for alg in CHECKSUM_ALGORITHMS},
+    )
+
+
+def _build(
+    root_path: Path,
+    files: list[dict],
+    commits: dict[int, tuple[str, int]],
+    out_dir: Path,
+    name: str | None,
+    output_format: str | None,
+    deduplicate: bool,
+    index: bool,
+    zstd_options: dict | None,
+    cancel: threading.Event | None,
+    filename: str | None,
+) -> Archive:
 
     def copy(src: Path, dest: Path):
         if src.is_dir():
@@ -44,16 +272,25 @@ def make(
             shutil.copy2(src, dest / src.name)
         return
 
-    out_dir.mkdir(parents=True, exist_ok=True)
+    source_date = max(timestamp for _, timestamp in commits.values()) if commits else None
     paths = {}
     with tempfile.TemporaryDirectory() as temp_dir:
-        for file_data in files:
-            source_path = Path(file_data.get('source', "."))
-            if not source_path.is_absolute():
-                source_path = root_path / source_path
+        for idx, file_data in enumerate(files):
             destination_path = Path(temp_dir) / file_data.get('destination', '.')
             destination_path.mkdir(parents=True, exist_ok=True)
             pattern = file_data.get('pattern')
+            if idx in commits:
+                git_source.export(
+                    repo_path=root_path,
+                    commit=commits[idx][0],
+                    source=file_data.get('source', "."),
+                    destination=destination_path,
+                    pattern=pattern,
+                )
+                continue
+            source_path = Path(file_data.get('source', "."))
+            if not source_path.is_absolute():
+                source_path = root_path / source_path
             if not pattern:
                 copy(source_path, destination_path)
                 continue
@@ -61,34 +298,436 @@ def make(
             for src_path in source_paths:
                 if re.match(file_data['pattern'], src_path.relative_to(source_path).as_posix()):
                     copy(src_path, destination_path)
-        copied_paths = list(Path(temp_dir).rglob('*'))
+        copied_paths = sorted(Path(temp_dir).rglob('*'))
         if not copied_paths:
             raise ValueError('No files copied')
-        if not output_format:
-            if len(copied_paths) > 1 or copied_paths[0].is_dir():
-                raise ValueError('Multiple files or directories copied, but no output format specified')
-            final_path = out_dir / copied_paths[0].name
-            shutil.copy2(copied_paths[0], final_path)
-            return final_path, ""
-        if not name:
-            name = copied_paths[0].name
-        archive_name = f"{name.removesuffix(f".{output_format}")}.{output_format}"
-        archive_path = out_dir / archive_name
-        if output_format == "zip":
-            with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for file_path in copied_paths:
-                    zipf.write(file_path, file_path.relative_to(temp_dir))
-            return archive_path, MIME_TYPE[output_format]
-        elif output_format in ['tar', 'tar.gz', 'tar.bz2', 'tar.xz']:
-            parts = output_format.split('.')
-            compression = parts[1] if len(parts) > 1 else None
-            mode = f"w:{compression}" if compression else "w"
-            with tarfile.open(archive_path, mode) as tar:
-                tar.add(temp_dir, arcname='.')
-            return archive_path, MIME_TYPE[compression or "tar"]
-        elif len(copied_paths) > 1 or copied_paths[0].is_dir():
-            raise ValueError('Multiple files or directories copied while using single file output format')
-        compression_module = COMPRESSION_MODULE[output_format]
-        with open(copied_paths[0], 'rb') as f_in, compression_module.open(archive_path, 'wb') as f_out:
+        if source_date is not None:
+            for path in (Path(temp_dir), *copied_paths):
+                os.utime(path, (source_date, source_date), follow_symlinks=False)
+        archive = _write(
+            temp_dir=Path(temp_dir),
+            copied_paths=copied_paths,
+            out_dir=out_dir,
+            name=name,
+            output_format=output_format,
+            source_date=source_date,
+            deduplicate=deduplicate,
+            index=index,
+            zstd_options=zstd_options,
+            cancel=cancel,
+            filename=filename,
+        )
+    return archive
+
+
+def _write(
+    temp_dir: Path,
+    copied_paths: list[Path],
+    out_dir: Path,
+    name: str | None,
+    output_format: str | None,
+    source_date: int | None,
+    deduplicate: bool,
+    index: bool,
+    zstd_options: dict | None,
+    cancel: threading.Event | None,
+    filename: str | None,
+) -> Archive:
+    if output_format not in ("zip", *TAR_FORMATS):
+        if len(copied_paths) > 1 or copied_paths[0].is_dir():
+            raise ValueError(
+                'Multiple files or directories copied while using single file output format'
+                if output_format else 'Multiple files or directories copied, but no output format specified'
+            )
+        if not copied_paths[0].exists():
+            raise ValueError(
+                f"Source file '{copied_paths[0].name}' is a symbolic link to a file outside of the asset, "
+                "which can only be added to zip and tar archives."
+            )
+    if not output_format:
+        final_path = out_dir / copied_paths[0].name
+        with open(copied_paths[0], 'rb') as f_in, _HashingWriter(final_path, cancel) as f_out:
             shutil.copyfileobj(f_in, f_out)
-        return archive_path, MIME_TYPE[output_format]
+        shutil.copystat(copied_paths[0], final_path)
+        return Archive(final_path, "", f_out.checksums)
+    if not name:
+        name = copied_paths[0].name
+    archive_name = f"{name.removesuffix(f".{output_format}")}.{output_format}"
+    archive_path = out_dir / archive_name
+    if output_format == "zip":
+        with _HashingWriter(archive_path, cancel) as f_out:
+            entries = zip_writer.write(
+                f_out,
+                members=[(file_path, file_path.relative_to(temp_dir).as_posix()) for file_path in copied_paths],
+                source_date=source_date,
+            )
+        archive = Archive(archive_path, MIME_TYPE[output_format], f_out.checksums)
+        if not index:
+            return archive
+        members = [
+            {
+                "name": entry.name,
+                "header_offset": entry.header_offset,
+                "data_offset": entry.data_offset,
+                "compression": "deflate" if entry.compress_type == zipfile.ZIP_DEFLATED else "store",
+                "compressed_size": entry.compress_size,
+                "size": entry.file_size,
+                "crc32": entry.crc,
+                "sha256": entry.sha256,
+            } for entry in entries
+        ]
+        return archive._replace(index=_write_index(archive, output_format, members, filename=filename))
+    elif output_format in TAR_FORMATS:
+        parts = output_format.split('.')
+        compression = parts[1] if len(parts) > 1 else None
+        tar_filter = _normalize_tarinfo if source_date is not None else None
+        checkpoints = None
+        with _HashingWriter(archive_path, cancel) as f_out:
+            if not compression:
+                tar_stream = contextlib.nullcontext(f_out)
+            elif index:
+                new_compressor = (
+                    zstd_compressor(**(zstd_options or {})).compressobj
+                    if compression == "zst" else _FRAME_COMPRESSOR[compression]
+                )
+                tar_stream = _FramedCompressor(f_out, new_compressor)
+                checkpoints = tar_stream.checkpoints
+            else:
+                tar_stream = _open_compressed(f_out, compression, source_date, zstd_options)
+            with tar_stream as f_tar, tarfile.open(fileobj=f_tar, mode="w") as tar:
+                deduplicated_size, members = _write_tar_members(
+                    tar,
+                    temp_dir,
+                    copied_paths,
+                    tar_filter=tar_filter,
+                    deduplicate=deduplicate,
+                    index=index,
+                    framed_stream=f_tar if checkpoints is not None else None,
+                )
+        archive = Archive(archive_path, MIME_TYPE[compression or "tar"], f_out.checksums, deduplicated_size)
+        if not index:
+            return archive
+        return archive._replace(
+            index=_write_index(archive, output_format, members, checkpoints, filename=filename)
+        )
+    with _HashingWriter(archive_path, cancel) as f_out:
+        with open(copied_paths[0], 'rb') as f_in, _open_compressed(
+            f_out, output_format, source_date, zstd_options
+        ) as f_comp:
+            shutil.copyfileobj(f_in, f_comp)
+    return Archive(archive_path, MIME_TYPE[output_format], f_out.checksums)
+
+
+def _write_tar_members(
+    tar: tarfile.TarFile,
+    temp_dir: Path,
+    copied_paths: list[Path],
+    tar_filter: Callable[[tarfile.TarInfo], tarfile.TarInfo] | None,
+    deduplicate: bool,
+    index: bool,
+    framed_stream: _FramedCompressor | None = None,
+) -> tuple[int, list[dict]]:
+    """Add all copied files to a tar archive.
+
+    Returns
+    -------
+    The number of bytes saved by deduplication,
+    and the index entries of all added members.
+    """
+
+    def add(tarinfo: tarfile.TarInfo, path: Path | None = None, digest: str | None = None):
+        if framed_stream and framed_stream.frame_size >= _CHECKPOINT_INTERVAL:
+            framed_stream.checkpoint()
+        header_offset = tar.offset
+        if path:
+            with open(path, 'rb') as file:
+                tar.addfile(tarinfo, file)
+        else:
+            tar.addfile(tarinfo)
+        members.append(
+            {
+                "name": tarinfo.name,
+                "type": _TAR_MEMBER_TYPE.get(tarinfo.type, "other"),
+                "header_offset": header_offset,
+                "data_offset": tar.offset - -(-tarinfo.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE,
+                "size": tarinfo.size,
+                "sha256": digest,
+                "linkname": tarinfo.linkname or None,
+                "checkpoint": len(framed_stream.checkpoints) - 1 if framed_stream else None,
+            }
+        )
+        return
+
+    members = []
+    tar_root = tar.gettarinfo(temp_dir, arcname='.')
+    add(tar_filter(tar_root) if tar_filter else tar_root)
+    first_arcnames = {}
+    deduplicated_size = 0
+    for path in copied_paths:
+        tarinfo = tar.gettarinfo(path, arcname=f"./{path.relative_to(temp_dir).as_posix()}")
+        if tar_filter:
+            tarinfo = tar_filter(tarinfo)
+        if not tarinfo.isreg():
+            add(tarinfo)
+            continue
+        digest = _file_digest(path) if deduplicate or index else None
+        if deduplicate:
+            # Hardlinks share their metadata on extraction, so the file mode is part of the key.
+            content_key = (digest, tarinfo.size, tarinfo.mode)
+            first_arcname = first_arcnames.setdefault(content_key, tarinfo.name)
+            if first_arcname != tarinfo.name:
+                deduplicated_size += tarinfo.size
+                tarinfo.type = tarfile.LNKTYPE
+                tarinfo.linkname = first_arcname
+                tarinfo.size = 0
+                add(tarinfo, digest=digest)
+                continue
+        add(tarinfo, path=path, digest=digest)
+    return deduplicated_size, members
+
+
+def _file_digest(path: Path) -> str:
+    hash_obj = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(_CHUNK_SIZE), b''):
+            hash_obj.update(chunk)
+    return hash_obj.hexdigest()
+
+
+def _write_index(
+    archive: Archive,
+    output_format: str,
+    members: list[dict],
+    checkpoints: list[tuple[int, int]] | None = None,
+    filename: str | None = None,
+) -> Archive:
+    filename = filename or archive.path.name
+    index = {
+        "version": 1,
+        "filename": filename,
+        "format": output_format,
+        "size": archive.path.stat().st_size,
+        "checksums": archive.checksums,
+        "checkpoints": [
+            {"offset": offset, "uncompressed_offset": uncompressed_offset}
+            for uncompressed_offset, offset in checkpoints
+        ] if checkpoints is not None else None,
+        "members": members,
+    }
+    index_path = archive.path.with_name(f"{filename}.index.json")
+    with _HashingWriter(index_path) as f_out:
+        f_out.write(json.dumps(index, separators=(",", ":")).encode())
+    return Archive(index_path, "application/json", f_out.checksums)
+
+
+def zstd_compressor(level: int = 3, threads: int = -1, long_distance_matching: bool = False) -> zstandard.ZstdCompressor:
+    """Create a Zstandard compressor.
+
+    Parameters
+    ----------
+    level
+        Compression level (1–22).
+        Levels above 19 require more memory for decompression as well.
+    threads
+        Number of worker threads; 0 compresses in the calling thread,
+        and -1 uses one thread per CPU.
+    long_distance_matching
+        Find matches up to 128 MiB apart (i.e., `zstd --long`),
+        which improves the compression of large archives with repeated content far apart,
+        e.g., multiple builds of the same package.
+        The output can still be decompressed without any additional options.
+    """
+    if not long_distance_matching:
+        return zstandard.ZstdCompressor(level=level, threads=threads, write_checksum=True)
+    params = zstandard.ZstdCompressionParameters.from_level(
+        level,
+        threads=threads,
+        enable_ldm=True,
+        window_log=_ZSTD_LONG_WINDOW_LOG,
+        write_checksum=True,
+    )
+    return zstandard.ZstdCompressor(compression_params=params)
+
+
+def _open_compressed(
+    fileobj: IO[bytes],
+    compression: str,
+    mtime: int | None = None,
+    zstd_options: dict | None = None,
+) -> IO[bytes]:
+    if compression == "gz":
+        # Set the timestamp in the gzip header explicitly;
+        # otherwise the current time is used, which makes the output non-reproducible.
+        return gzip.GzipFile(filename="", mode="wb", fileobj=fileobj, mtime=mtime)
+    if compression == "zst":
+        return zstd_compressor(**(zstd_options or {})).stream_writer(fileobj, closefd=False)
+    return COMPRESSION_MODULE[compression].open(fileobj, "wb")
+
+
+def _normalize_tarinfo(tarinfo: tarfile.TarInfo) -> tarfile.TarInfo:
+    """Remove all metadata of the build environment (ownership, umask) from a tar member."""
+    tarinfo.uid = tarinfo.gid = 0
+    tarinfo.uname = tarinfo.gname = ""
+    if tarinfo.isdir():
+        tarinfo.mode = 0o755
+    elif tarinfo.issym():
+        tarinfo.mode = 0o777
+    else:
+        tarinfo.mode = 0o755 if tarinfo.mode & 0o111 else 0o644
+    return tarinfo
+
+
+def _cache_key(
+    root_path: Path,
+    files: list[dict],
+    commits: dict[int, tuple[str, int]],
+    options: dict,
+) -> str:
+    spec = {
+        "options": options,
+        "files": [
+            file_data | {
+                "object": git_source.object_id(root_path, commits[idx][0], file_data.get("source", ".")),
+                "source_date": commits[idx][1],
+            }
+            for idx, file_data in enumerate(files)
+        ],
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def _load_from_cache(cache_path: Path, out_dir: Path) -> Archive | None:
+    info_path = cache_path / _CACHE_INFO_FILENAME
+    if not info_path.is_file():
+        return None
+    info = json.loads(info_path.read_text())
+    index_info = info.pop("index")
+    archive = _copy_from_cache(info, cache_path, out_dir)
+    if index_info:
+        archive = archive._replace(index=_copy_from_cache(index_info, cache_path, out_dir))
+    return archive
+
+
+def _copy_from_cache(info: dict, cache_path: Path, out_dir: Path) -> Archive:
+    filename = info.pop("filename")
+    final_path = out_dir / filename
+    shutil.copy2(cache_path / filename, final_path)
+    return Archive(path=final_path, **info)
+
+
+def _save_to_cache(cache_path: Path, archive: Archive) -> None:
+
+    def cache_info(file: Archive) -> dict:
+        file_info = file._asdict() | {"filename": file.path.name}
+        for key in ("path", "parts", "index"):
+            file_info.pop(key)
+        return file_info
+
+    cache_path.mkdir(parents=True, exist_ok=True)
+    info = cache_info(archive) | {"index": cache_info(archive.index) if archive.index else None}
+    writers = [
+        (file.path.name, functools.partial(shutil.copy2, file.path))
+        for file in (archive, archive.index) if file
+    ]
+    writers.append((_CACHE_INFO_FILENAME, lambda path: path.write_text(json.dumps(info))))
+    # Files are written under a temporary name and then atomically renamed,
+    # since the same asset may be built concurrently for multiple releases.
+    # The info file is written last, so that an interrupted write never results in a cache hit.
+    for filename, write in writers:
+        with tempfile.NamedTemporaryFile(dir=cache_path, delete=False) as temp_file:
+            temp_path = Path(temp_file.name)
+        write(temp_path)
+        os.replace(temp_path, cache_path / filename)
+    return
+
+
+class _HashingWriter(io.RawIOBase):
+    """Write-only binary file that computes checksums of all data written to it.
+
+    The file is deliberately non-seekable, since going back to patch written data
+    would invalidate the running digests.
+    If `cancel` is set, further writes raise a `concurrent.futures.CancelledError`.
+    """
+
+    def __init__(self, path: Path, cancel: threading.Event | None = None):
+        super().__init__()
+        self._file = open(path, 'wb')
+        self._cancel = cancel
+        self._hashes = {algorithm: hashlib.new(algorithm) for algorithm in CHECKSUM_ALGORITHMS}
+        self._position = 0
+        return
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self._cancel is not None and self._cancel.is_set():
+            raise CancelledError(f"Writing '{self._file.name}' was cancelled.")
+        for hash_obj in self._hashes.values():
+            hash_obj.update(data)
+        self._position += len(data)
+        return self._file.write(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        if not self._file.closed:
+            self._file.flush()
+        return
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.close()
+        super().close()
+        return
+
+    @property
+    def checksums(self) -> dict[str, str]:
+        return {algorithm: hash_obj.hexdigest() for algorithm, hash_obj in self._hashes.items()}
+
+
+class _FramedCompressor(io.RawIOBase):
+    """Write-only binary stream that compresses data as a sequence of independent frames.
+
+    Each call to `checkpoint` ends the current frame
+    (i.e., a complete gzip member, bzip2 stream, xz stream or zstd frame),
+    so that decompression can start from there.
+    The concatenated frames form a valid file in the respective format.
+    """
+
+    def __init__(self, fileobj: _HashingWriter, new_compressor: Callable[[], Any]):
+        super().__init__()
+        self._file = fileobj
+        self._new_compressor = new_compressor
+        self._compressor = self._new_compressor()
+        self._position = 0
+        self.frame_size = 0
+        self.checkpoints: list[tuple[int, int]] = [(0, fileobj.tell())]
+        return
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._file.write(self._compressor.compress(data))
+        self._position += len(data)
+        self.frame_size += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def checkpoint(self) -> None:
+        """End the current frame and start a new one at the current position."""
+        self._file.write(self._compressor.flush())
+        self._compressor = self._new_compressor()
+        self.frame_size = 0
+        self.checkpoints.append((self._position, self._file.tell()))
+        return
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.write(self._compressor.flush())
+        super().close()
+        return
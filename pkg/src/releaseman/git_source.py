@@ -0,0 +1,170 @@
+"""Read asset files directly from the object database of a git repository.
+
+This allows building assets for any commit or tag without a checkout,
+and independent of untracked files or build artifacts in the working tree.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+import os
+import re
+import subprocess
+from pathlib import Path, PurePosixPath
+
+if TYPE_CHECKING:
+    from typing import IO
+
+
+_CHUNK_SIZE = 1024 * 1024
+_MODE_SYMLINK = "120000"
+_MODE_EXECUTABLE = "100755"
+
+
+def resolve(repo_path: Path, ref: str) -> tuple[str, int]:
+    """Resolve a git reference to a commit.
+
+    Parameters
+    ----------
+    repo_path
+        Path to the git repository.
+    ref
+        Commit hash, branch or tag name.
+
+    Returns
+    -------
+    The full commit hash and the commit timestamp (seconds since epoch).
+    """
+    output = _run(repo_path, "show", "--no-patch", "--format=%H %ct", f"{ref}^{{commit}}", "--")
+    commit_hash, timestamp = output.decode().strip().split()
+    return commit_hash, int(timestamp)
+
+
+def object_id(repo_path: Path, commit: str, source: str) -> str:
+    """Get the ID of the tree or blob object at `source` in the given commit."""
+    return _run(repo_path, "rev-parse", "--verify", f"{commit}:{_normalize(source)}").decode().strip()
+
+
+def export(
+    repo_path: Path,
+    commit: str,
+    source: str,
+    destination: Path,
+    pattern: str | None = None,
+) -> None:
+    """Write files from a commit to a directory.
+
+    The semantics are the same as selecting files from the working tree
+    in `releaseman.file_archiver.make`:
+    When `source` is a directory, its content is written to `destination`,
+    otherwise the file is written to `destination` under its own name.
+    When `pattern` is given, each file or directory under `source`
+    whose path (relative to `source`) matches the pattern is selected in the same way.
+    """
+    source = _normalize(source)
+    entries = _ls_tree(repo_path, commit, source)
+    if not entries:
+        raise ValueError(f"Source '{source or '.'}' does not exist in commit '{commit}'.")
+    if not pattern:
+        is_file = len(entries) == 1 and entries[0][3] == source
+        selected = [(source, "blob" if is_file else "tree")]
+    else:
+        source_prefix = f"{source}/" if source else ""
+        selected = [
+            (path, typ) for _, typ, _, path in _ls_tree(repo_path, commit, source, recursive_trees=True)
+            if path.startswith(source_prefix) and re.match(pattern, path.removeprefix(source_prefix))
+        ]
+    blobs = []
+    for selected_path, typ in selected:
+        if typ == "blob":
+            mode, _, sha, path = next(entry for entry in entries if entry[3] == selected_path)
+            blobs.append((mode, sha, destination / PurePosixPath(path).name))
+            continue
+        tree_prefix = f"{selected_path}/" if selected_path else ""
+        for mode, _, sha, path in entries:
+            if path.startswith(tree_prefix):
+                blobs.append((mode, sha, destination / path.removeprefix(tree_prefix)))
+    _write_blobs(repo_path, blobs)
+    return
+
+
+def _ls_tree(
+    repo_path: Path, commit: str, source: str, recursive_trees: bool = False
+) -> list[tuple[str, str, str, str]]:
+    """List blobs (and optionally trees) under `source`, sorted by path.
+
+    Submodules (i.e., 'commit' entries) are skipped, as their content is not part of the repository.
+    """
+    args = ["ls-tree", "-r", "-z", "--full-tree"]
+    if recursive_trees:
+        args.append("-t")
+    args.append(commit)
+    if source:
+        args.extend(["--", source])
+    entries = []
+    for line in _run(repo_path, *args).decode().split("\0"):
+        if not line:
+            continue
+        info, path = line.split("\t", 1)
+        mode, typ, sha = info.split()
+        if typ == "commit":
+            continue
+        entries.append((mode, typ, sha, path))
+    return sorted(entries, key=lambda entry: entry[3])
+
+
+def _write_blobs(repo_path: Path, blobs: list[tuple[str, str, Path]]) -> None:
+    """Stream blob contents from a single `git cat-file --batch` process to files."""
+    if not blobs:
+        return
+    process = subprocess.Popen(
+        ["git", "-C", str(repo_path), "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    try:
+        for mode, sha, path in blobs:
+            process.stdin.write(f"{sha}\n".encode())
+            process.stdin.flush()
+            header = process.stdout.readline().decode().split()
+            if len(header) != 3 or header[1] != "blob":
+                raise ValueError(f"Could not read git object '{sha}': {' '.join(header)}")
+            size = int(header[2])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if mode == _MODE_SYMLINK:
+                path.unlink(missing_ok=True)
+                os.symlink(process.stdout.read(size).decode(), path)
+            else:
+                with open(path, "wb") as file:
+                    _copy_exact(process.stdout, file, size)
+                path.chmod(0o755 if mode == _MODE_EXECUTABLE else 0o644)
+            process.stdout.read(1)  # Trailing newline after each object
+    finally:
+        process.stdin.close()
+        process.stdout.close()
+        process.wait()
+    return
+
+
+def _copy_exact(src: IO[bytes], dst: IO[bytes], size: int) -> None:
+    while size:
+        chunk = src.read(min(size, _CHUNK_SIZE))
+        if not chunk:
+            raise ValueError("Unexpected end of git object stream.")
+        dst.write(chunk)
+        size -= len(chunk)
+    return
+
+
+def _normalize(source: str) -> str:
+    path = PurePosixPath(source).as_posix()
+    return "" if path == "." else path.strip("/")
+
+
+def _run(repo_path: Path, *args: str) -> bytes:
+    result = subprocess.run(["git", "-C", str(repo_path), *args], capture_output=True)
+    if result.returncode != 0:
+        raise ValueError(
+            f"Git command 'git {' '.join(args)}' failed: {result.stderr.decode().strip()}"
+        )
+    return result.stdout
@@ -1,20 +1,23 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
-from pathlib import Path
 
 import pylinks as pl
+from pylinks.exception.api import WebAPIStatusCodeError
 from loggerman import logger
 
-from releaseman import file_archiver
+from releaseman.journal import Journal
+from releaseman.manager import ReleaseManager, UploadResponse
 
 if TYPE_CHECKING:
+    from pathlib import Path
     from github_contexts import GitHubContext
     from releaseman.dstruct import Token
+    from releaseman.manager import Upload
     from releaseman.report import Reporter
 
 
-class GitHubRelease:
+class GitHubRelease(ReleaseManager):
 
     def __init__(
         self,
@@ -25,29 +28,98 @@ class GitHubRelease:
         reporter: Reporter,
         context: GitHubContext,
     ):
-        self.path_root = root_path
-        self.path_out = output_path
-        self.config = config
         self.token = token
-        self.reporter = reporter
-        self.api = pl.api.github(
-            token=token.get() or context.token
-        ).user(
+        self.repo_fullname = (
+            f"{config.get('repo_owner', context.repository_owner)}/"
+            f"{config.get('repo_name', context.repository_name)}"
+        )
+        self.github_api = pl.api.github(token=token.get() or context.token)
+        self.api = self.github_api.user(
             config.get("repo_owner", context.repository_owner)
         ).repo(
             config.get("repo_name", context.repository_name)
         )
+        super().__init__(
+            root_path=root_path,
+            output_path=output_path,
+            assets_path=output_path / "github",
+            config=config,
+            reporter=reporter,
+            journal=Journal(
+                output_path / "journal" / "github.json",
+                # Only re-run attempts of the same workflow run (which keep the run ID) resume the journal,
+                # so that e.g. successive updates of the same release are never skipped.
+                target={
+                    "run_id": context.run_id,
+                    "repo": self.repo_fullname,
+                    "release_id": config.get("release_id"),
+                    "tag_name": config.get("tag_name"),
+                },
+            ),
+            title="GitHub",
+            report_name="github",
+            checksum_algorithm="sha256",
+        )
+        self._asset_ids_to_delete: list[int] = []
         return
 
-    def run(self):
+    def _prepare(self) -> None:
+        try:
+            self.github_api.rest_query(f"repos/{self.repo_fullname}")
+        except Exception as e:
+            raise ValueError(
+                f"GitHub repository '{self.repo_fullname}' does not exist or is not accessible with the given token."
+            ) from e
+        # A release created in a previous (failed) run is resumed instead of created again.
+        release_id = self.config.get("release_id") or self.journal.get("release_id")
+        if release_id:
+            try:
+                self.api.release_get(release_id)
+            except Exception as e:
+                raise ValueError(
+                    f"GitHub release '{release_id}' does not exist in repository '{self.repo_fullname}'."
+                ) from e
+        else:
+            tag_name = self.config["tag_name"]
+            if self._release_exists(tag_name):
+                raise ValueError(
+                    f"A GitHub release for tag '{tag_name}' already exists in repository '{self.repo_fullname}'."
+                )
+        assets_to_del = self.config.get("delete_assets")
+        if not (self.config.get("release_id") and assets_to_del) or self.journal.get("assets_deleted"):
+            return
+        asset_ids = [asset["id"] for asset in self.api.release_asset_list(release_id)]
+        if isinstance(assets_to_del, list):
+            for asset_to_del in assets_to_del:
+                if asset_to_del not in asset_ids and not self.journal.is_deleted(asset_to_del):
+                    raise ValueError(
+                        f"Cannot delete old version file '{asset_to_del}' as it does not exist."
+                    )
+            self._asset_ids_to_delete = [asset_id for asset_id in asset_ids if asset_id in assets_to_del]
+        else:
+            self._asset_ids_to_delete = asset_ids
+        return
+
+    def _release_exists(self, tag_name: str) -> bool:
+        try:
+            self.github_api.rest_query(f"repos/{self.repo_fullname}/releases/tags/{tag_name}")
+        except WebAPIStatusCodeError as e:
+            if e.response.status_code == 404:
+                return False
+            raise
+        return True
+
+    def _release(self) -> None:
         release_id = self.config.get("release_id")
         release_data = {
             k: v for k, v in self.config.items()
-            if k not in ("repo_owner", "repo_name", "release_id", "delete_assets", "assets") and v is not None
+            if k not in (
+                "repo_owner", "repo_name", "release_id", "delete_assets", "assets", "checksum_manifest"
+            ) and v is not None
         }
         if release_id:
-            self._remove_files(release_id)
-            self._add_files(release_id)
+            self._remove_files()
+            self._upload_assets(release_id)
             release_data.pop("generate_release_notes", None)
             if release_data:
                 response = self.api.release_update(release_id=release_id, **release_data)
@@ -56,63 +128,46 @@ class GitHubRelease:
                     str(response)
                 )
             return
-        release_response = self.api.release_create(**release_data)
-        logger.success(
-            "GitHub Release Creation",
-            str(release_response)
-        )
-        self._add_files(release_response["id"])
+        release_id = self.journal.get("release_id")
+        if not release_id:
+            release_response = self.api.release_create(**release_data)
+            logger.success(
+                "GitHub Release Creation",
+                str(release_response)
+            )
+            release_id = release_response["id"]
+            self.journal.record("release_id", release_id)
+        self._upload_assets(release_id)
         return
 
-    def _remove_files(self, release_id: int):
-        assets_to_del = self.config.get("delete_assets")
-        if not assets_to_del:
+    def _remove_files(self):
+        if not self.config.get("delete_assets"):
             logger.info(
                 "GitHub Asset Deletion",
                 "No assets provided."
             )
             return
-        asset_ids = [asset["id"] for asset in self.api.release_asset_list(release_id)]
-        if isinstance(assets_to_del, list):
-            for asset_to_del in assets_to_del:
-                if asset_to_del not in asset_ids:
-                    raise ValueError(
-                        f"Cannot delete old version file '{asset_to_del}' as it does not exist."
-                    )
-            for asset_id in asset_ids:
-                if asset_id in assets_to_del:
-                    self.api.release_asset_delete(asset_id)
-        else:
-            for asset_id in asset_ids:
-                self.api.release_asset_delete(asset_id)
+        if self.journal.get("assets_deleted"):
+            return
+        for asset_id in self._asset_ids_to_delete:
+            if self.journal.is_deleted(asset_id):
+                continue
+            self.api.release_asset_delete(asset_id)
+            self.journal.record_deletion(asset_id)
+        self.journal.record("assets_deleted")
         return
 
-    def _add_files(self, release_id: int):
-        assets = self.config.get("assets")
-        if not assets:
-            logger.info(
-                "GitHub Asset Upload",
-                "No assets provided."
-            )
-            return
-        for asset in assets:
-            filepath, mime_type = file_archiver.make(
-                root_path=self.path_root,
-                files=asset["files"],
-                out_dir = self.path_out / "github",
-                name=asset.get("name"),
-                output_format=asset.get("format"),
-            )
-            filename = asset.get("name", filepath.name)
-            upload_response = self.api.release_asset_upload(
-                release_id=release_id,
-                filepath=filepath,
-                mime_type=mime_type or asset["media_type"],
-                name=filename,
-                label=asset.get("label", "")
-            )
-            logger.info(
-                f"GitHub Asset Upload: {filename}",
-                str(upload_response),
-            )
+    def _upload_file(self, target: int, upload: Upload) -> UploadResponse:
+        response = self.api.release_asset_upload(
+            release_id=target,
+            filepath=upload.archive.path,
+            mime_type=upload.mime_type,
+            name=upload.name,
+            label=upload.label,
+        )
+        # GitHub reports the SHA-256 checksum of each stored asset as 'sha256:<hex digest>'.
+        return UploadResponse(response, response.get("digest"), response["id"])
+
+    def _delete_upload(self, target: int, remote_id: int) -> None:
+        self.api.release_asset_delete(remote_id)
         return
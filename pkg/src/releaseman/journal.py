@@ -0,0 +1,143 @@
+"""Durable journal of completed release steps, for resuming failed runs."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import mdit
+
+if TYPE_CHECKING:
+    from typing import Any
+    from pathlib import Path
+
+
+def digest(data: Any) -> str:
+    """Compute a stable digest of JSON-serializable data, e.g., to record the content of a completed step."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class Journal:
+    """Record of the completed steps of a release.
+
+    Each step is written to disk as soon as it is completed,
+    so that a failed run can be repeated (e.g., after fixing the configuration)
+    to continue from the point of failure, instead of repeating
+    (and possibly duplicating) already completed remote changes.
+
+    Parameters
+    ----------
+    path
+        Path to the journal file.
+    target
+        Identity of the release target, e.g., the workflow run ID, and the repository and tag of a GitHub release.
+        A journal recorded for a different target is discarded,
+        as its steps do not apply to the current release.
+        Including the workflow run ID (which is kept by re-run attempts) ensures that
+        only a failed run is resumed, and a completed journal never skips a later release.
+        Other configuration changes keep the journal;
+        uploaded files are compared by their digests instead.
+    """
+
+    def __init__(self, path: Path, target: dict):
+        self.path = path
+        self.fingerprint = digest(target)
+        self._lock = threading.Lock()
+        self._data = self._load()
+        self.resumed = bool(self._data["steps"] or self._data["uploads"] or self._data["deletions"])
+        return
+
+    @property
+    def completed(self) -> bool:
+        """Whether the release was already completed in a previous run."""
+        return self._data["completed"]
+
+    def get(self, step: str, default: Any = None) -> Any:
+        """Get the recorded result of a completed step, or `default` if the step is not completed."""
+        return self._data["steps"].get(step, default)
+
+    def record(self, step: str, value: Any = True) -> None:
+        """Record a completed step along with its result (e.g., the ID of a created resource)."""
+        with self._lock:
+            self._data["steps"][step] = value
+            self._save()
+        return
+
+    def upload(self, name: str) -> dict | None:
+        """Get the record of an uploaded file, with keys `digest` and `id`."""
+        return self._data["uploads"].get(name)
+
+    def record_upload(self, name: str, digest: str, remote_id: Any = None) -> None:
+        """Record an uploaded file by its name, verified content digest, and remote ID."""
+        with self._lock:
+            self._data["uploads"][name] = {"digest": digest, "id": remote_id}
+            self._save()
+        return
+
+    def is_deleted(self, item: Any) -> bool:
+        """Whether a remote file (identified by its ID or name) was already deleted."""
+        return item in self._data["deletions"]
+
+    def record_deletion(self, item: Any) -> None:
+        """Record a deleted remote file, identified by its ID or name."""
+        with self._lock:
+            self._data["deletions"].append(item)
+            self._save()
+        return
+
+    def complete(self) -> None:
+        """Mark the release as completed."""
+        with self._lock:
+            self._data["completed"] = True
+            self._save()
+        return
+
+    def summary(self, title: str) -> mdit.element.Admonition:
+        """Summarize the journal state for the report."""
+        if self._data["completed"]:
+            status = "The release is completed."
+        elif self.resumed:
+            status = "The release was resumed from a previous run, and is not completed."
+        else:
+            status = "The release is not completed."
+        return mdit.element.admonition(
+            title=title,
+            body=mdit.block_container(
+                status,
+                mdit.element.code_block(
+                    json.dumps(self._data, indent=4),
+                    caption=str(self.path),
+                ),
+            ),
+            type="note",
+            dropdown=True,
+        )
+
+    def _load(self) -> dict:
+        data = {"fingerprint": self.fingerprint, "completed": False, "steps": {}, "uploads": {}, "deletions": []}
+        if not self.path.is_file():
+            return data
+        try:
+            recorded = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return data
+        if recorded.get("fingerprint") != self.fingerprint:
+            return data
+        return recorded
+
+    def _save(self) -> None:
+        # Written atomically, so that an interrupted write never leaves a corrupt journal behind.
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(self._data, file, indent=4)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return
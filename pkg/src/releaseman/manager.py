@@ -0,0 +1,298 @@
+"""Base class of release managers, handling the assets of a release."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+import abc
+
+from loggerman import logger
+
+from releaseman import file_archiver
+
+if TYPE_CHECKING:
+    import threading
+    from concurrent.futures import Executor, Future
+    from pathlib import Path
+    from typing import Any, Literal
+    from releaseman.dstruct import Archive
+    from releaseman.journal import Journal
+    from releaseman.report import Reporter
+
+
+_MAX_PARALLEL_UPLOADS = 4
+# Files are uploaded from memory (the API clients read each file entirely),
+# so the number of parallel uploads is limited by their total size.
+_MAX_PARALLEL_UPLOAD_BYTES = 2 * 1024 ** 3
+
+
+class Upload(NamedTuple):
+    """A file to upload to a release."""
+    archive: Archive
+    name: str
+    mime_type: str | None = None
+    label: str = ""
+
+
+class UploadResponse(NamedTuple):
+    """Response to an uploaded file.
+
+    `checksum` is the checksum of the stored file as reported by the service,
+    in the form `<algorithm>:<hex digest>`, or `None` if not reported.
+    """
+    response: dict
+    checksum: str | None
+    remote_id: Any = None
+
+
+class ReleaseManager(abc.ABC):
+    """Base class of release managers.
+
+    Assets are built in the background as soon as `build_assets` is called,
+    and uploaded (along with their parts, indices and the checksum manifest) by `_upload_assets`.
+    All completed steps are recorded in the journal,
+    so that a failed release can be resumed by running it again.
+
+    Subclasses implement the read-only checks in `_prepare`,
+    the release itself in `_release`, and the upload of a single file in `_upload_file`.
+
+    Parameters
+    ----------
+    root_path
+        Path to the root of the repository.
+    output_path
+        Path to the output directory shared by all release managers.
+    assets_path
+        Path to the output directory of the assets of this release.
+    config
+        Release configuration.
+    reporter
+        Reporter to add the journal state and results to.
+    journal
+        Journal of the release.
+    title
+        Name of the release target, used in logs and the report.
+    report_name
+        Name of the pipeline in the report.
+    checksum_algorithm
+        Checksum algorithm used by the service to report the checksums of uploaded files.
+    """
+
+    def __init__(
+        self,
+        root_path: Path,
+        output_path: Path,
+        assets_path: Path,
+        config: dict,
+        reporter: Reporter,
+        journal: Journal,
+        title: str,
+        report_name: Literal["github", "zenodo"],
+        checksum_algorithm: Literal["sha256", "md5"],
+    ):
+        self.path_root = root_path
+        self.path_out = output_path
+        self.path_out_assets = assets_path
+        self.config = config
+        self.reporter = reporter
+        self.journal = journal
+        self.title = title
+        self._report_name = report_name
+        self._checksum_algorithm = checksum_algorithm
+        self._asset_builds: list[Future[Archive]] | None = None
+        self._cancel: threading.Event | None = None
+        self._prepared = False
+        return
+
+    def build_assets(self, executor: Executor, cancel: threading.Event | None = None) -> list[Future[Archive]]:
+        """Start building all assets in the background.
+
+        This only writes local files, and can thus run in parallel with `prepare`.
+        Setting `cancel` stops all builds that are still writing.
+        """
+        self._cancel = cancel
+        if self.journal.completed:
+            self._asset_builds = []
+            return self._asset_builds
+        self._asset_builds = [
+            executor.submit(self._build_asset, asset) for asset in self.config.get("assets", [])
+        ]
+        return self._asset_builds
+
+    def prepare(self) -> None:
+        """Run all read-only API checks, so that invalid inputs are detected before any change is made."""
+        self._prepared = True
+        if not self.journal.completed:
+            self._prepare()
+        return
+
+    def wait_for_assets(self) -> list[Archive]:
+        """Wait for all asset builds to finish, raising the first build error if any."""
+        if self._asset_builds is None:
+            return [self._build_asset(asset) for asset in self.config.get("assets", [])]
+        return [build.result() for build in self._asset_builds]
+
+    def run(self) -> None:
+        try:
+            self._run()
+        finally:
+            self.reporter.add(self._report_name, body=self.journal.summary(f"{self.title} Release Journal"))
+        return
+
+    def _run(self) -> None:
+        if self.journal.completed:
+            logger.info(
+                f"{self.title} Release",
+                f"Already completed in a previous run, according to the journal at '{self.journal.path}'.",
+            )
+            self.reporter.add(self._report_name, status="skip", summary="Already completed in a previous run.")
+            return
+        if self.journal.resumed:
+            logger.info(
+                f"{self.title} Release",
+                f"Resuming from the journal at '{self.journal.path}'.",
+            )
+        if not self._prepared:
+            self.prepare()
+        self._release()
+        self.journal.complete()
+        return
+
+    @abc.abstractmethod
+    def _prepare(self) -> None:
+        """Run the read-only API checks of the release."""
+        ...
+
+    @abc.abstractmethod
+    def _release(self) -> None:
+        """Create or update the release, uploading all assets with `_upload_assets`."""
+        ...
+
+    @abc.abstractmethod
+    def _upload_file(self, target: Any, upload: Upload) -> UploadResponse:
+        """Upload a single file to the release `target` (e.g., the release ID or deposition)."""
+        ...
+
+    def _delete_upload(self, target: Any, remote_id: Any) -> None:
+        """Delete a file uploaded in a previous run, before uploading it again with a different content.
+
+        By default, nothing is deleted, i.e., uploading to an existing filename must overwrite the file.
+        """
+        return
+
+    def _build_asset(self, asset: dict) -> Archive:
+        return file_archiver.make(
+            root_path=self.path_root,
+            files=asset["files"],
+            out_dir=self.path_out_assets,
+            name=asset.get("name"),
+            output_format=asset.get("format"),
+            cache_dir=self.path_out / "cache",
+            deduplicate=asset.get("deduplicate", False),
+            split_size=asset.get("split_size"),
+            index=asset.get("index", False),
+            zstd_options=asset.get("zstd"),
+            cancel=self._cancel,
+            filename=asset.get("name"),
+        )
+
+    def _upload_assets(self, target: Any) -> None:
+        """Upload all assets to the release `target`, followed by the checksum manifest if configured.
+
+        Split assets are uploaded as their parts and reassembly manifest,
+        named after the asset (see `file_archiver.split`),
+        and asset indices are uploaded alongside their assets.
+        """
+        assets = self.config.get("assets")
+        if not assets:
+            logger.info(
+                f"{self.title} Asset Upload",
+                "No assets provided."
+            )
+            return
+        checksums = {}
+        for asset, archive in zip(assets, self.wait_for_assets()):
+            label = asset.get("label", "")
+            if archive.parts:
+                uploads = [
+                    Upload(part, part.path.name, part.mime_type, f"{label} ({part.path.name})" if label else "")
+                    for part in archive.parts
+                ]
+            else:
+                uploads = [
+                    Upload(
+                        archive,
+                        asset.get("name", archive.path.name),
+                        archive.mime_type or asset.get("media_type"),
+                        label,
+                    )
+                ]
+            if archive.index:
+                uploads.append(Upload(archive.index, archive.index.path.name, archive.index.mime_type))
+            self._upload_files(target, uploads)
+            for upload in uploads:
+                checksums[upload.name] = upload.archive.checksums
+            if asset.get("deduplicate") and asset.get("format") in file_archiver.TAR_FORMATS:
+                logger.info(
+                    f"{self.title} Asset Deduplication: {uploads[0].name}",
+                    f"Saved {archive.deduplicated_size} bytes by storing duplicate files as hardlinks.",
+                )
+        manifest_config = self.config.get("checksum_manifest")
+        if manifest_config:
+            manifest = file_archiver.write_checksum_manifest(
+                checksums=checksums,
+                out_dir=self.path_out_assets,
+                name=manifest_config.get("name"),
+                algorithm=manifest_config["algorithm"],
+            )
+            self._upload_files(target, [Upload(manifest, manifest.path.name, manifest.mime_type)])
+        return
+
+    def _upload_files(self, target: Any, uploads: list[Upload]) -> None:
+        """Upload files, in parallel if there are multiple files (e.g., parts of a split asset).
+
+        At most `_MAX_PARALLEL_UPLOADS` files are uploaded at once,
+        and fewer for large files, so that at most about `_MAX_PARALLEL_UPLOAD_BYTES` are held in memory.
+        Files already uploaded with the same content in a previous run (according to the journal) are skipped.
+        """
+        pending = []
+        for upload in uploads:
+            recorded = self.journal.upload(upload.name)
+            if recorded and recorded["digest"] == self._checksum(upload.archive):
+                logger.info(
+                    f"{self.title} Asset Upload: {upload.name}",
+                    "Already uploaded in a previous run.",
+                )
+                continue
+            if recorded:
+                # Uploaded in a previous run with a different content (i.e., the build is not reproducible).
+                self._delete_upload(target, recorded["id"])
+            pending.append(upload)
+        if not pending:
+            return
+        largest_size = max(upload.archive.path.stat().st_size for upload in pending)
+        max_workers = min(
+            len(pending), _MAX_PARALLEL_UPLOADS, max(1, _MAX_PARALLEL_UPLOAD_BYTES // max(largest_size, 1))
+        )
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="releaseman-upload") as executor:
+            responses = [executor.submit(self._upload_and_verify, target, upload) for upload in pending]
+        for upload, response in zip(pending, responses):
+            logger.info(
+                f"{self.title} Asset Upload: {upload.name}",
+                str(response.result()),
+            )
+        return
+
+    def _upload_and_verify(self, target: Any, upload: Upload) -> dict:
+        uploaded = self._upload_file(target, upload)
+        checksum = self._checksum(upload.archive)
+        if uploaded.checksum and uploaded.checksum != checksum:
+            raise ValueError(
+                f"Checksum mismatch for uploaded file '{upload.name}': "
+                f"expected '{checksum}', but {self.title} reported '{uploaded.checksum}'."
+            )
+        self.journal.record_upload(upload.name, digest=checksum, remote_id=uploaded.remote_id)
+        return uploaded.response
+
+    def _checksum(self, archive: Archive) -> str:
+        return f"{self._checksum_algorithm}:{archive.checksums[self._checksum_algorithm]}"
@@ -0,0 +1,171 @@
+"""Shared HTTP transport for all release managers."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+import threading
+import time
+import urllib.parse
+
+import pylinks as pl
+import requests
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class Transport:
+    """Pooled HTTP transport with keep-alive and per-host connection metrics.
+
+    PyLinks API clients send each request through the module-level `requests.request` function,
+    which opens a new connection (including a new TLS handshake) for every request.
+    Once installed, all their requests are instead sent through a single `requests.Session`,
+    reusing connections to each host across all release managers.
+
+    Parameters
+    ----------
+    pool_size
+        Maximum number of connections kept open per host,
+        i.e., the maximum number of concurrent requests to the same host without waiting.
+    connect_timeout
+        Timeout in seconds for establishing a connection.
+    read_timeout
+        Timeout in seconds between bytes received from the server.
+    hosts
+        Mapping of hostnames to base URLs that should be used instead,
+        e.g., `{"api.github.com": "http://127.0.0.1:8000"}`
+        to run against a local stand-in server in tests.
+    session
+        Session to use. If not given, a new session is created.
+    """
+
+    exceptions = requests.exceptions
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        connect_timeout: float = 10,
+        read_timeout: float = 120,
+        hosts: dict[str, str] | None = None,
+        session: requests.Session | None = None,
+    ):
+        self.session = session or requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self.timeout = (connect_timeout, read_timeout)
+        self._hosts = {
+            host: urllib.parse.urlsplit(base_url) for host, base_url in (hosts or {}).items()
+        }
+        self._metrics: dict[str, dict[str, int | float]] = {}
+        self._lock = threading.Lock()
+        self._installed_requests = None
+        return
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send an HTTP request through the shared session.
+
+        This has the same signature as `requests.request`.
+        Timeouts passed by the caller are replaced by the ones configured for the transport.
+        """
+        url = self._redirect(url)
+        kwargs["timeout"] = self.timeout
+        host = urllib.parse.urlsplit(url).netloc
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method=method, url=url, **kwargs)
+        except requests.exceptions.RequestException:
+            self._record(host, error=True, elapsed=time.perf_counter() - start)
+            raise
+        self._record(
+            host,
+            error=not response.ok,
+            elapsed=time.perf_counter() - start,
+            bytes_sent=int(response.request.headers.get("Content-Length", 0)),
+            bytes_received=len(response.content),
+        )
+        return response
+
+    def install(self) -> None:
+        """Route all requests sent by PyLinks through this transport."""
+        if self._installed_requests is None:
+            self._installed_requests = pl.http.requests
+            pl.http.requests = self
+        return
+
+    def uninstall(self) -> None:
+        """Restore the default (unpooled) behavior of PyLinks."""
+        if self._installed_requests is not None:
+            pl.http.requests = self._installed_requests
+            self._installed_requests = None
+        return
+
+    def close(self) -> None:
+        self.uninstall()
+        self.session.close()
+        return
+
+    def __enter__(self) -> Transport:
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+        return
+
+    @property
+    def metrics(self) -> dict[str, dict[str, int | float]]:
+        """Per-host request and connection metrics.
+
+        For each host, this includes the number of requests, failed requests,
+        bytes sent and received, total request time in seconds,
+        and the number of connections opened, which is lower than the number of requests
+        when connections are reused.
+        """
+        with self._lock:
+            metrics = {host: dict(host_metrics) for host, host_metrics in self._metrics.items()}
+        pools = self._adapter.poolmanager.pools
+        for pool_key in pools.keys():
+            pool = pools.get(pool_key)
+            if pool is None:
+                continue
+            netloc = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+            if netloc in metrics:
+                metrics[netloc]["connections"] = pool.num_connections
+        return metrics
+
+    def _redirect(self, url: str) -> str:
+        parts = urllib.parse.urlsplit(url)
+        target = self._hosts.get(parts.hostname)
+        if not target:
+            return url
+        path = f"{target.path.rstrip('/')}{parts.path}"
+        return urllib.parse.urlunsplit((target.scheme, target.netloc, path, parts.query, parts.fragment))
+
+    def _record(
+        self,
+        host: str,
+        error: bool,
+        elapsed: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        with self._lock:
+            host_metrics = self._metrics.setdefault(
+                host,
+                {
+                    "requests": 0,
+                    "errors": 0,
+                    "bytes_sent": 0,
+                    "bytes_received": 0,
+                    "time": 0.0,
+                    "connections": 0,
+                },
+            )
+            host_metrics["requests"] += 1
+            host_metrics["errors"] += int(error)
+            host_metrics["bytes_sent"] += bytes_sent
+            host_metrics["bytes_received"] += bytes_received
+            host_metrics["time"] += elapsed
+        return
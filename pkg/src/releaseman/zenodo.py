@@ -1,19 +1,21 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
-from pathlib import Path
 
 import pylinks as pl
 from loggerman import logger
 
-from releaseman import file_archiver
+from releaseman.journal import Journal, digest
+from releaseman.manager import ReleaseManager, UploadResponse
 
 if TYPE_CHECKING:
+    from pathlib import Path
     from releaseman.dstruct import Token
+    from releaseman.manager import Upload
     from releaseman.report import Reporter
 
 
-class ZenodoRelease:
+class ZenodoRelease(ReleaseManager):
 
     def __init__(
         self,
@@ -23,39 +25,82 @@ class ZenodoRelease:
         token: Token,
         sandbox: bool,
         reporter: Reporter,
+        run_id: int,
     ):
-        self.path_root = root_path
-        self.path_out = output_path
-        self.config = config
-        self.reporter = reporter
-
+        name = "zenodo_sandbox" if sandbox else "zenodo"
+        super().__init__(
+            root_path=root_path,
+            output_path=output_path,
+            # Separate output directories, since sandbox and production assets are built concurrently.
+            assets_path=output_path / name,
+            config=config,
+            reporter=reporter,
+            # Only re-run attempts of the same workflow run (which keep the run ID) resume the journal,
+            # so that e.g. successive new depositions are never skipped.
+            journal=Journal(
+                output_path / "journal" / f"{name}.json",
+                target={
+                    "run_id": run_id,
+                    "sandbox": sandbox,
+                    "deposition_id": config.get("deposition_id"),
+                    "version": (config.get("metadata") or {}).get("version"),
+                },
+            ),
+            title="Zenodo Sandbox" if sandbox else "Zenodo",
+            report_name="zenodo",
+            checksum_algorithm="md5",
+        )
         self.api = pl.api.zenodo(
             token=token.get(),
             sandbox=sandbox
         )
+        self._deposition: dict | None = None
+        return
+
+    def _prepare(self) -> None:
         try:
             self.api.deposition_list()
         except Exception as e:
             raise ValueError("Zenodo token is not valid") from e
-
-
+        depo_id = self.config.get("deposition_id")
+        if not depo_id:
+            return
+        self._deposition = self.api.deposition_retrieve(deposition_id=depo_id)
+        files_to_delete = self.config.get("delete_assets")
+        if isinstance(files_to_delete, list) and not self.journal.get("assets_deleted"):
+            old_filenames = [file["filename"] for file in self._deposition["files"]]
+            for file_to_delete in files_to_delete:
+                if file_to_delete not in old_filenames and not self.journal.is_deleted(file_to_delete):
+                    raise ValueError(
+                        f"Cannot delete old version file '{file_to_delete}' as it does not exist."
+                    )
         return
 
-    def run(self):
+    def _release(self) -> None:
         depo_id = self.config.get("deposition_id")
         metadata = self.config.get("metadata")
-        if depo_id:
-            depo_data = self.api.deposition_retrieve(deposition_id=depo_id)
+        journal_depo_id = self.journal.get("deposition_id")
+        if journal_depo_id:
+            # Retrieved again, as files may have been added or deleted since it was recorded.
+            depo = self.api.deposition_retrieve(deposition_id=journal_depo_id)
+        elif depo_id:
+            depo_data = self._deposition
             if depo_data["submitted"]:
                 depo = self.api.deposition_new_version(deposition_id=depo_id)
             else:
                 depo = depo_data
-            if metadata:
-                self.api.deposition_update(deposition_id=depo["id"], metadata=metadata)
-            self.remove_files(depo)
+            self.journal.record("deposition_id", depo["id"])
         else:
             depo = self.api.deposition_create(metadata=metadata)
-        self.add_files(depo)
+            self.journal.record("deposition_id", depo["id"])
+            self.journal.record("metadata", digest(metadata))
+        # Metadata is updated again when it was changed (e.g., fixed) since a previous run.
+        if metadata and self.journal.get("metadata") != digest(metadata):
+            self.api.deposition_update(deposition_id=depo["id"], metadata=metadata)
+            self.journal.record("metadata", digest(metadata))
+        if depo_id:
+            self.remove_files(depo)
+        self._upload_assets(depo)
         if self.config["publish"]:
             release_response = self.api.deposition_publish(deposition_id=depo["id"])
             logger.success(
@@ -72,50 +117,30 @@ class ZenodoRelease:
                 "No assets provided."
             )
             return
+        if self.journal.get("assets_deleted"):
+            return
         if isinstance(files_to_delete, list):
-            old_filenames = [file["filename"] for file in deposition["files"]]
-            for file_to_delete in files_to_delete:
-                if file_to_delete not in old_filenames:
-                    raise ValueError(
-                        f"Cannot delete old version file '{file_to_delete}' as it does not exist."
-                    )
             for old_file in deposition["files"]:
                 if old_file["filename"] in files_to_delete:
                     self.api.file_delete(
                         deposition_id=deposition["id"],
                         file_id=old_file["id"]
                     )
+                    self.journal.record_deletion(old_file["filename"])
         else:
             for old_file in deposition["files"]:
                 self.api.file_delete(deposition_id=deposition["id"], file_id=old_file["id"])
+                self.journal.record_deletion(old_file["filename"])
+        self.journal.record("assets_deleted")
         return
 
-    def add_files(self, deposition: dict):
-        assets = self.config.get("assets")
-        if not assets:
-            logger.info(
-                "Zenodo Asset Upload",
-                "No files provided."
-            )
-            return
-        for asset in assets:
-            filepath, _ = file_archiver.make(
-                root_path=self.path_root,
-                files=asset["files"],
-                out_dir = self.path_out / "zenodo",
-                name=asset.get("name"),
-                output_format=asset.get("format"),
-            )
-            filename = asset.get("name", filepath.name)
-            upload_response = self.api.file_create(
-                bucket_id=deposition["links"]["bucket"],
-                filepath=filepath,
-                name=filename,
-            )
-            logger.info(
-                f"Zenodo Asset Upload: {filename}",
-                str(upload_response),
-            )
-        return
-
-
+    def _upload_file(self, target: dict, upload: Upload) -> UploadResponse:
+        # Uploading to an existing filename overwrites the file in the deposition bucket,
+        # so files uploaded with a different content in a previous run are simply replaced.
+        response = self.api.file_create(
+            bucket_id=target["links"]["bucket"],
+            filepath=upload.archive.path,
+            name=upload.name,
+        )
+        # Zenodo reports the MD5 checksum of each stored file as 'md5:<hex digest>'.
+        return UploadResponse(response, response.get("checksum"), response.get("version_id"))
@@ -0,0 +1,356 @@
+"""Zip archive writer with parallel member compression.
+
+Members of a zip archive are compressed independently of each other,
+so they are deflated concurrently in worker threads
+(`zlib` releases the GIL while compressing),
+and then written sequentially to the output stream,
+followed by the central directory.
+Members whose content is already compressed (e.g., wheels, images, nested archives)
+are detected by their extension or by sampling the entropy of their content,
+and stored without compression.
+Archives exceeding the limits of the original zip format are written with ZIP64 extensions.
+Symbolic links are stored as link entries, like in tar archives, instead of being followed.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+import collections
+import hashlib
+import math
+import io
+import os
+import shutil
+import stat
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from typing import IO
+    from pathlib import Path
+
+
+_CHUNK_SIZE = 1024 * 1024
+_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+_ENTROPY_SAMPLE_SIZE = 64 * 1024
+_ENTROPY_THRESHOLD = 7.5  # bits per byte; the maximum is 8
+_COMPRESSED_SUFFIXES = {
+    ".7z", ".avif", ".br", ".bz2", ".gif", ".gz", ".heic", ".jar", ".jpeg", ".jpg", ".lz", ".lz4",
+    ".lzma", ".m4a", ".mkv", ".mov", ".mp3", ".mp4", ".ogg", ".png", ".rar", ".tgz", ".webm",
+    ".webp", ".whl", ".woff", ".woff2", ".xz", ".zip", ".zst",
+}
+_ZIP64_LIMIT = _ZIP64_MARKER = 0xFFFFFFFF
+_ZIP64_COUNT_LIMIT = _ZIP64_COUNT_MARKER = 0xFFFF
+_VERSION_DEFAULT = 20
+_VERSION_ZIP64 = 45
+_VERSION_MADE_BY = (3 << 8) | _VERSION_ZIP64  # Unix
+_FLAG_UTF8 = 0x800
+_STRUCT_LOCAL_HEADER = struct.Struct("<4sHHHHHLLLHH")
+_STRUCT_CENTRAL_HEADER = struct.Struct("<4sHHHHHHLLLHHHHHLL")
+_STRUCT_END_RECORD = struct.Struct("<4sHHHHLLH")
+_STRUCT_END_RECORD_ZIP64 = struct.Struct("<4sQHHLLQQQQ")
+_STRUCT_END_LOCATOR_ZIP64 = struct.Struct("<4sLQL")
+
+
+class ZipEntry(NamedTuple):
+    """A member written to a zip archive."""
+    name: str
+    header_offset: int
+    data_offset: int
+    compress_type: int
+    compress_size: int
+    file_size: int
+    crc: int
+    date_time: tuple[int, int, int, int, int, int]
+    external_attr: int
+    sha256: str | None
+
+
+class _CompressedMember(NamedTuple):
+    info: zipfile.ZipInfo
+    source: Path | None
+    data: IO[bytes] | None
+    sha256: str | None
+
+
+def write(
+    fileobj: IO[bytes],
+    members: list[tuple[Path, str]],
+    compresslevel: int = zlib.Z_DEFAULT_COMPRESSION,
+    max_workers: int | None = None,
+    source_date: int | None = None,
+) -> list[ZipEntry]:
+    """Write a zip archive to a (non-seekable) binary stream.
+
+    Parameters
+    ----------
+    fileobj
+        Binary stream to write the archive to.
+        It is written sequentially, i.e., no seeking is required.
+    members
+        Paths to files and directories, along with their names in the archive.
+    compresslevel
+        Deflate compression level (0–9).
+    max_workers
+        Maximum number of compression threads.
+        Defaults to the number of CPUs.
+    source_date
+        Timestamp (seconds since epoch) to set for all members.
+        File modes are then normalized as well (0755 for directories and executables, 0644 otherwise),
+        so that the output does not depend on the time zone or umask of the build environment.
+
+    Returns
+    -------
+    Written entries, in the same order as `members`.
+    """
+    entries = []
+    offset = 0
+    max_workers = max_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="releaseman-zip") as executor:
+        # Only a bounded number of members are compressed ahead of the writer,
+        # to limit the amount of buffered compressed data.
+        window = collections.deque()
+        max_pending = max_workers * 2
+        members = iter(members)
+        while True:
+            while len(window) < max_pending:
+                member = next(members, None)
+                if member is None:
+                    break
+                window.append(executor.submit(_compress, *member, compresslevel, source_date))
+            if not window:
+                break
+            compressed = window.popleft().result()
+            entry = _write_member(fileobj, compressed, offset)
+            offset = entry.data_offset + entry.compress_size
+            entries.append(entry)
+    _write_central_directory(fileobj, entries, offset)
+    return entries
+
+
+def _compress(path: Path, arcname: str, compresslevel: int, source_date: int | None) -> _CompressedMember:
+    info = _zip_info(path, arcname, source_date)
+    info.file_size = 0
+    info.CRC = 0
+    info.compress_size = 0
+    info.compress_type = zipfile.ZIP_STORED
+    if info.is_dir():
+        return _CompressedMember(info, None, None, None)
+    if stat.S_ISLNK(info.external_attr >> 16):
+        # The link target is stored as the content of the entry.
+        target = os.readlink(path).encode()
+        info.file_size = info.compress_size = len(target)
+        info.CRC = zlib.crc32(target)
+        return _CompressedMember(info, None, io.BytesIO(target), None)
+    hash_obj = hashlib.sha256()
+    with open(path, "rb") as file:
+        sample = file.read(_ENTROPY_SAMPLE_SIZE)
+        file.seek(0)
+        if not _is_compressible(path, sample):
+            crc = 0
+            for chunk in iter(lambda: file.read(_CHUNK_SIZE), b""):
+                crc = zlib.crc32(chunk, crc)
+                hash_obj.update(chunk)
+                info.file_size += len(chunk)
+            info.CRC = crc
+            info.compress_size = info.file_size
+            return _CompressedMember(info, path, None, hash_obj.hexdigest())
+        data = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE)
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+        crc = 0
+        for chunk in iter(lambda: file.read(_CHUNK_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+            hash_obj.update(chunk)
+            info.file_size += len(chunk)
+            data.write(compressor.compress(chunk))
+        data.write(compressor.flush())
+    info.CRC = crc
+    compress_size = data.tell()
+    if compress_size >= info.file_size:
+        # Deflating did not pay off; store the original content instead.
+        data.close()
+        info.compress_size = info.file_size
+        return _CompressedMember(info, path, None, hash_obj.hexdigest())
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.compress_size = compress_size
+    data.seek(0)
+    return _CompressedMember(info, None, data, hash_obj.hexdigest())
+
+
+def _zip_info(path: Path, arcname: str, source_date: int | None) -> zipfile.ZipInfo:
+    """Create the entry info of a file, like `zipfile.ZipInfo.from_file` but without following symlinks."""
+    st = os.lstat(path)
+    mode = st.st_mode
+    if source_date is None:
+        date_time = time.localtime(st.st_mtime)[:6]
+    else:
+        date_time = time.gmtime(source_date)[:6]
+        if stat.S_ISDIR(mode):
+            mode = stat.S_IFDIR | 0o755
+        elif stat.S_ISLNK(mode):
+            mode = stat.S_IFLNK | 0o777
+        else:
+            mode = stat.S_IFREG | (0o755 if mode & 0o111 else 0o644)
+    is_dir = stat.S_ISDIR(mode)
+    if is_dir and not arcname.endswith("/"):
+        arcname += "/"
+    info = zipfile.ZipInfo(arcname, date_time)
+    info.external_attr = (mode & 0xFFFF) << 16
+    if is_dir:
+        info.external_attr |= 0x10  # MS-DOS directory flag
+    return info
+
+
+def _is_compressible(path: Path, sample: bytes) -> bool:
+    """Estimate whether a file is worth compressing, from its extension and the entropy of a sample."""
+    if path.suffix.lower() in _COMPRESSED_SUFFIXES:
+        return False
+    if len(sample) < 1024:
+        # Too small for a meaningful estimate; compressing is cheap anyway.
+        return True
+    num_bytes = len(sample)
+    entropy = -sum(
+        count / num_bytes * math.log2(count / num_bytes)
+        for count in collections.Counter(sample).values()
+    )
+    return entropy < _ENTROPY_THRESHOLD
+
+
+def _write_member(fileobj: IO[bytes], member: _CompressedMember, offset: int) -> ZipEntry:
+    info = member.info
+    filename, flags = _encode_filename(info.filename)
+    extra = b""
+    version = _VERSION_DEFAULT
+    file_size = info.file_size
+    compress_size = info.compress_size
+    if file_size >= _ZIP64_LIMIT or compress_size >= _ZIP64_LIMIT:
+        extra = struct.pack("<HHQQ", 1, 16, file_size, compress_size)
+        file_size = compress_size = _ZIP64_MARKER
+        version = _VERSION_ZIP64
+    header = _STRUCT_LOCAL_HEADER.pack(
+        b"PK\003\004",
+        version,
+        flags,
+        info.compress_type,
+        *_dos_datetime(info.date_time),
+        info.CRC,
+        compress_size,
+        file_size,
+        len(filename),
+        len(extra),
+    )
+    fileobj.write(header)
+    fileobj.write(filename)
+    fileobj.write(extra)
+    if member.data is not None:
+        with member.data:
+            shutil.copyfileobj(member.data, fileobj, _CHUNK_SIZE)
+    elif member.source is not None:
+        with open(member.source, "rb") as file:
+            shutil.copyfileobj(file, fileobj, _CHUNK_SIZE)
+    return ZipEntry(
+        name=info.filename,
+        header_offset=offset,
+        data_offset=offset + len(header) + len(filename) + len(extra),
+        compress_type=info.compress_type,
+        compress_size=info.compress_size,
+        file_size=info.file_size,
+        crc=info.CRC,
+        date_time=info.date_time,
+        external_attr=info.external_attr,
+        sha256=member.sha256,
+    )
+
+
+def _write_central_directory(fileobj: IO[bytes], entries: list[ZipEntry], offset: int) -> None:
+    central_dir_offset = offset
+    central_dir_size = 0
+    for entry in entries:
+        filename, flags = _encode_filename(entry.name)
+        zip64_fields = []
+        file_size, compress_size, header_offset = entry.file_size, entry.compress_size, entry.header_offset
+        if file_size >= _ZIP64_LIMIT:
+            zip64_fields.append(file_size)
+            file_size = _ZIP64_MARKER
+        if compress_size >= _ZIP64_LIMIT:
+            zip64_fields.append(compress_size)
+            compress_size = _ZIP64_MARKER
+        if header_offset >= _ZIP64_LIMIT:
+            zip64_fields.append(header_offset)
+            header_offset = _ZIP64_MARKER
+        extra = b""
+        version = _VERSION_DEFAULT
+        if zip64_fields:
+            extra = struct.pack(f"<HH{len(zip64_fields)}Q", 1, 8 * len(zip64_fields), *zip64_fields)
+            version = _VERSION_ZIP64
+        header = _STRUCT_CENTRAL_HEADER.pack(
+            b"PK\001\002",
+            _VERSION_MADE_BY,
+            version,
+            flags,
+            entry.compress_type,
+            *_dos_datetime(entry.date_time),
+            entry.crc,
+            compress_size,
+            file_size,
+            len(filename),
+            len(extra),
+            0,  # Comment length
+            0,  # Disk number start
+            0,  # Internal attributes
+            entry.external_attr,
+            header_offset,
+        )
+        fileobj.write(header)
+        fileobj.write(filename)
+        fileobj.write(extra)
+        central_dir_size += len(header) + len(filename) + len(extra)
+    num_entries = len(entries)
+    end_offset = central_dir_offset + central_dir_size
+    if (
+        num_entries >= _ZIP64_COUNT_LIMIT
+        or central_dir_offset >= _ZIP64_LIMIT
+        or central_dir_size >= _ZIP64_LIMIT
+    ):
+        fileobj.write(
+            _STRUCT_END_RECORD_ZIP64.pack(
+                b"PK\006\006",
+                _STRUCT_END_RECORD_ZIP64.size - 12,
+                _VERSION_MADE_BY,
+                _VERSION_ZIP64,
+                0,
+                0,
+                num_entries,
+                num_entries,
+                central_dir_size,
+                central_dir_offset,
+            )
+        )
+        fileobj.write(_STRUCT_END_LOCATOR_ZIP64.pack(b"PK\006\007", 0, end_offset, 1))
+        num_entries = min(num_entries, _ZIP64_COUNT_MARKER)
+        central_dir_offset = min(central_dir_offset, _ZIP64_MARKER)
+        central_dir_size = min(central_dir_size, _ZIP64_MARKER)
+    fileobj.write(
+        _STRUCT_END_RECORD.pack(
+            b"PK\005\006", 0, 0, num_entries, num_entries, central_dir_size, central_dir_offset, 0
+        )
+    )
+    return
+
+
+def _encode_filename(filename: str) -> tuple[bytes, int]:
+    try:
+        return filename.encode("ascii"), 0
+    except UnicodeEncodeError:
+        return filename.encode("utf-8"), _FLAG_UTF8
+
+
+def _dos_datetime(date_time: tuple[int, int, int, int, int, int]) -> tuple[int, int]:
+    year, month, day, hour, minute, second = date_time
+    dos_time = hour << 11 | minute << 5 | second // 2
+    dos_date = (year - 1980) << 9 | month << 5 | day
+    return dos_time, dos_date